@@ -1,11 +1,24 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
-from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, flash, abort, jsonify, make_response
+from flask_migrate import Migrate
+from sqlalchemy import event, func, case, delete, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user
+from werkzeug.security import check_password_hash   # legacy PBKDF2 hashes only
+from itsdangerous import TimestampSigner, SignatureExpired, BadSignature
+from collections import deque, namedtuple
+from cachetools import TTLCache
+import hashlib
 import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 from werkzeug.utils import secure_filename   # ✅ for safe file names
+from models import db, bcrypt, User, Item
 
 # ---------------------------------
 # App Setup
@@ -14,45 +27,168 @@ app = Flask(__name__)
 app.config["SECRET_KEY"] = "secret-key"
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///lostfound.db"
 app.config["UPLOAD_FOLDER"] = "static/images"
-
-db = SQLAlchemy(app)
+app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024   # 16 MB upload limit
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600         # cache static files for 1 hr
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "query_cache_size": 1200,  # compiled SQL statement cache
+    "connect_args": {"check_same_thread": False},
+}
+app.config["BCRYPT_LOG_ROUNDS"] = 12
+
+db.init_app(app)
+bcrypt.init_app(app)
+migrate = Migrate(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
-# Token Serializer (for reset password)
-serializer = URLSafeTimedSerializer(app.config["SECRET_KEY"])
+# SQLite tuning: WAL lets readers run during a write, NORMAL skips most fsyncs
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+# Token Signer (for reset password)
+# The key only depends on SECRET_KEY + salt, so derive it once here and
+# sign with it as-is instead of re-deriving it on every sign/unsign.
+reset_key = TimestampSigner(
+    app.config["SECRET_KEY"], salt="password-reset", key_derivation="hmac", digest_method=hashlib.sha256
+).derive_key()
+reset_signer = TimestampSigner(reset_key, key_derivation="none", digest_method=hashlib.sha256)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# ---------------------------------
+# Cache (dashboard stats)
+# ---------------------------------
+cache = TTLCache(maxsize=8, ttl=30)
+cache_lock = threading.Lock()
+cache_generation = 0   # bumped on every clear
+
+def get_or_set(key, loader):
+    with cache_lock:
+        try:
+            return cache[key]
+        except KeyError:
+            generation = cache_generation
+    value = loader()
+    with cache_lock:
+        # A clear while loader() ran means value may be stale → don't store it
+        if cache_generation == generation:
+            cache[key] = value
+    return value
+
+user_cache = TTLCache(maxsize=1024, ttl=60)   # user id → {id, name, email}
+
+def clear_dashboard_cache():
+    global cache_generation
+    with cache_lock:
+        cache_generation += 1
+        cache.pop("stats", None)
+
+# ---------------------------------
+# Latest Items (kept in memory, patched on add / delete / status change)
+# ---------------------------------
+RecentItem = namedtuple("RecentItem", "id title type location image date_reported is_resolved")
+RECENT_ITEM_COLUMNS = (
+    Item.id, Item.title, Item.type, Item.location, Item.image, Item.date_reported, Item.is_resolved,
+)
+RECENT_ITEMS_TTL = 30   # reload from DB so other workers' changes show up
+
+recent_items = deque(maxlen=12)
+recent_lock = threading.Lock()
+recent_loaded_at = None
+
+def get_recent_items():
+    global recent_loaded_at
+    with recent_lock:
+        if recent_loaded_at is None or time.monotonic() - recent_loaded_at > RECENT_ITEMS_TTL:
+            recent_items.clear()
+            recent_items.extend(RecentItem(*row) for row in load_recent_items())
+            recent_loaded_at = time.monotonic()
+        return list(recent_items)
+
+def push_recent_item(row):
+    with recent_lock:
+        if recent_loaded_at is None:
+            return
+        # A reload after the INSERT committed may already include this row
+        if any(entry.id == row.id for entry in recent_items):
+            return
+        recent_items.appendleft(RecentItem(*row))
+
+def update_recent_item(item_id, **changes):
+    with recent_lock:
+        for i, entry in enumerate(recent_items):
+            if entry.id == item_id:
+                recent_items[i] = entry._replace(**changes)
+                break
+
+def drop_recent_item(item_id):
+    global recent_loaded_at
+    with recent_lock:
+        if any(entry.id == item_id for entry in recent_items):
+            recent_loaded_at = None   # refill from DB on next read
 
 # ---------------------------------
-# Models
+# Password Hashing
 # ---------------------------------
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100))
-    email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
-
-    # ✅ Relationship
-    items = db.relationship("Item", backref="user", lazy=True)
-
-class Item(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(100), nullable=False)
-    type = db.Column(db.String(50), nullable=False)  # Lost or Found
-    location = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text, nullable=False)
-    image = db.Column(db.String(200))
-    date_reported = db.Column(db.DateTime, default=datetime.utcnow)
-    is_resolved = db.Column(db.Boolean, default=False)
-
-    # ✅ Foreign key
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+def hash_password(password):
+    return bcrypt.generate_password_hash(password).decode("utf-8")
+
+def verify_password(user, password):
+    if user.password.startswith("$2"):
+        return bcrypt.check_password_hash(user.password, password)
+
+    # Old Werkzeug PBKDF2 hash → check it, then upgrade to bcrypt
+    if not check_password_hash(user.password, password):
+        return False
+    user.password = hash_password(password)
+    db.session.commit()
+    return True
 
 # ---------------------------------
 # User Loader
 # ---------------------------------
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    with cache_lock:
+        fields = user_cache.get(user_id)
+
+    if fields is None:
+        user = db.session.get(User, user_id)
+        if user:
+            with cache_lock:
+                user_cache[user_id] = {"id": user.id, "name": user.name, "email": user.email}
+        return user
+
+    # ✅ Rebuild the user from cached fields and attach it without a SELECT
+    user = User(**fields)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+# ---------------------------------
+# Conditional Responses (ETag → 304)
+# ---------------------------------
+def make_etag(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+def render_conditional(etag, template, **context):
+    # Browser already has this exact page → skip rendering, send 304
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = make_response(render_template(template, **context))
+    response.set_etag(etag)
+    response.cache_control.private = True    # pages are per-user
+    response.cache_control.no_cache = True   # always revalidate
+    return response
 
 # ---------------------------------
 # Routes
@@ -68,16 +204,15 @@ def register():
         email = request.form["email"]
         password = request.form["password"]
 
-        if User.query.filter_by(email=email).first():
+        if db.session.scalar(select(User.id).where(User.email == email)):
             flash("Email already registered!", "danger")
             return redirect(url_for("register"))
 
-        new_user = User(
+        db.session.execute(insert(User).values(
             name=name,
             email=email,
-            password=generate_password_hash(password, method="pbkdf2:sha256"),
-        )
-        db.session.add(new_user)
+            password=hash_password(password),
+        ))
         db.session.commit()
         flash("Registration successful! Please log in.", "success")
         return redirect(url_for("login"))
@@ -89,8 +224,8 @@ def login():
         email = request.form["email"]
         password = request.form["password"]
 
-        user = User.query.filter_by(email=email).first()
-        if user and check_password_hash(user.password, password):
+        user = db.session.scalar(select(User).where(User.email == email))
+        if user and verify_password(user, password):
             login_user(user)
             return redirect(url_for("dashboard"))
         flash("Invalid credentials", "danger")
@@ -102,21 +237,86 @@ def logout():
     logout_user()
     return redirect(url_for("login"))
 
+def load_recent_items():
+    # ✅ Only the columns the cards show (skips the description TEXT)
+    return db.session.execute(
+        select(*RECENT_ITEM_COLUMNS)
+        .order_by(Item.date_reported.desc())
+        .limit(12)
+    ).all()
+
+def load_stats():
+    # ✅ All counts in a single query
+    row = db.session.query(
+        func.count(Item.id),
+        func.sum(case((Item.type == "Lost", 1), else_=0)),
+        func.sum(case((Item.type == "Found", 1), else_=0)),
+        func.sum(case((Item.is_resolved == True, 1), else_=0)),
+    ).one()
+    return tuple(value or 0 for value in row)
+
 @app.route("/dashboard")
 @login_required
 def dashboard():
     items = Item.query.filter_by(user_id=current_user.id).order_by(Item.date_reported.desc()).all()
-    all_items = Item.query.order_by(Item.date_reported.desc()).limit(12).all()  # latest 12 items
+    all_items = get_recent_items()  # latest 12 items
+    total, lost, found, resolved = get_or_set("stats", load_stats)
 
     stats = {
-        "total": Item.query.count(),
-        "lost": Item.query.filter_by(type="Lost").count(),
-        "found": Item.query.filter_by(type="Found").count(),
-        "resolved": Item.query.filter_by(is_resolved=True).count(),
-        "mine": Item.query.filter_by(user_id=current_user.id).count(),
+        "total": total,
+        "lost": lost,
+        "found": found,
+        "resolved": resolved,
+        "mine": len(items),
     }
 
-    return render_template("dashboard.html", items=items, all_items=all_items, stats=stats)
+    # Ids get reused after deletes, so date_reported marks which item an id is
+    etag = make_etag(
+        current_user.id, current_user.name, total, lost, found, resolved,
+        [(item.id, item.date_reported, item.is_resolved) for item in items],
+        [(item.id, item.date_reported, item.is_resolved) for item in all_items],
+    )
+    return render_conditional(etag, "dashboard.html", items=items, all_items=all_items, stats=stats)
+
+# ---------------------------------
+# Image Uploads
+# ---------------------------------
+HASHED_IMAGE_RE = re.compile(r"^images/[0-9a-f]{32}\.\w+$")
+HASHED_IMAGE_MAX_AGE = 31536000   # 1 year
+
+def save_image(image_file):
+    # ✅ Name the file by its content hash → identical uploads share one file
+    ext = os.path.splitext(secure_filename(image_file.filename))[1].lower()
+    digest = hashlib.file_digest(image_file.stream, "sha256").hexdigest()[:32]
+    filename = digest + ext
+    image_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+
+    if not os.path.exists(image_path):
+        # Write to a temp file first, then rename → the hashed name only ever holds a complete file
+        image_file.stream.seek(0)
+        with tempfile.NamedTemporaryFile(
+            dir=app.config["UPLOAD_FOLDER"], suffix=".tmp", buffering=UPLOAD_CHUNK_SIZE, delete=False
+        ) as f:
+            try:
+                shutil.copyfileobj(image_file.stream, f, length=UPLOAD_CHUNK_SIZE)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.chmod(f.name, 0o644)   # temp files start as 0600
+        os.replace(f.name, image_path)
+    return filename
+
+@app.after_request
+def cache_hashed_images(response):
+    # Hash-named images never change, so browsers can keep them forever
+    if request.endpoint == "static" and HASHED_IMAGE_RE.match(request.view_args.get("filename", "")):
+        response.cache_control.public = True
+        response.cache_control.max_age = HASHED_IMAGE_MAX_AGE
+        response.cache_control.immutable = True
+        # send_file set Expires from SEND_FILE_MAX_AGE_DEFAULT (1 hr) → match the 1 year
+        response.expires = int(time.time() + HASHED_IMAGE_MAX_AGE)
+    return response
 
 # ---------------------------------
 # Add Item Route
@@ -134,21 +334,24 @@ def add_item():
         image_file = request.files.get("image")
         image_filename = None
         if image_file and image_file.filename != "":
-            filename = secure_filename(image_file.filename)
-            image_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-            image_file.save(image_path)
-            image_filename = filename
-
-        new_item = Item(
-            title=title,
-            type=type_,
-            location=location,
-            description=description,
-            image=image_filename,
-            user_id=current_user.id
-        )
-        db.session.add(new_item)
+            image_filename = save_image(image_file)
+
+        # ✅ Plain INSERT (no ORM unit-of-work); RETURNING gives the card fields
+        new_item = db.session.execute(
+            insert(Item)
+            .values(
+                title=title,
+                type=type_,
+                location=location,
+                description=description,
+                image=image_filename,
+                user_id=current_user.id
+            )
+            .returning(*RECENT_ITEM_COLUMNS)
+        ).one()
         db.session.commit()
+        clear_dashboard_cache()
+        push_recent_item(new_item)
         flash("Item reported successfully ✅", "success")
         return redirect(url_for("dashboard"))
 
@@ -161,9 +364,9 @@ def add_item():
 def forgot_password():
     if request.method == "POST":
         email = request.form["email"]
-        user = User.query.filter_by(email=email).first()
+        user = db.session.scalar(select(User).where(User.email == email))
         if user:
-            token = serializer.dumps(user.id, salt="password-reset")
+            token = reset_signer.sign(str(user.id)).decode()
             reset_url = url_for("reset_password", token=token, _external=True)
             print(f"\n🔑 Password reset link for {email}: {reset_url}\n")  # Console only
             flash("Password reset link has been generated (check server console).", "info")
@@ -175,12 +378,12 @@ def forgot_password():
 @app.route("/reset_password/<token>", methods=["GET", "POST"])
 def reset_password(token):
     try:
-        user_id = serializer.loads(token, salt="password-reset", max_age=3600)  # valid 1 hr
+        user_id = int(reset_signer.unsign(token, max_age=3600))  # valid 1 hr
     except (SignatureExpired, BadSignature):
         flash("Invalid or expired reset link!", "danger")
         return redirect(url_for("login"))
 
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         flash("User not found!", "danger")
         return redirect(url_for("login"))
@@ -193,8 +396,10 @@ def reset_password(token):
             flash("Passwords do not match!", "danger")
             return redirect(request.url)
 
-        user.password = generate_password_hash(new_password, method="pbkdf2:sha256")
+        user.password = hash_password(new_password)
         db.session.commit()
+        with cache_lock:
+            user_cache.pop(user.id, None)
         flash("Password reset successful! Please log in.", "success")
         return redirect(url_for("login"))
 
@@ -206,8 +411,12 @@ def reset_password(token):
 @app.route("/item/<int:item_id>")
 @login_required
 def item_detail(item_id):
-    item = Item.query.get_or_404(item_id)
-    return render_template("item_detail.html", item=item)
+    # ✅ Reporter name/email are shown, so load the user in the same query
+    item = db.session.get(Item, item_id, options=[joinedload(Item.user)]) or abort(404)
+    etag = make_etag(
+        current_user.id, item.id, item.date_reported, item.is_resolved, item.user.name, item.user.email
+    )
+    return render_conditional(etag, "item_detail.html", item=item)
 
 # ---------------------------------
 # Update Status (Mark Resolved / Pending)
@@ -215,22 +424,29 @@ def item_detail(item_id):
 @app.route("/update_status/<int:item_id>", methods=["POST"])
 @login_required
 def update_status(item_id):
-    item = Item.query.get_or_404(item_id)
+    # Toggle status — only matches if the current user owns the item
+    row = db.session.execute(
+        update(Item)
+        .where(Item.id == item_id, Item.user_id == current_user.id)
+        .values(is_resolved=Item.is_resolved.is_not(True))
+        .returning(Item.is_resolved)
+    ).first()
+    db.session.commit()
 
-    # Only owner can update
-    if item.user_id != current_user.id:
+    if row is None:
+        if db.session.scalar(select(Item.id).where(Item.id == item_id)) is None:
+            abort(404)
         if request.headers.get("X-Requested-With") == "XMLHttpRequest":
             return jsonify({"error": "Not allowed"}), 403
         flash("You are not allowed to update this item.", "danger")
         return redirect(url_for("dashboard"))
 
-    # Toggle status
-    item.is_resolved = not item.is_resolved
-    db.session.commit()
+    clear_dashboard_cache()
+    update_recent_item(item_id, is_resolved=row.is_resolved)
 
     # AJAX request → return JSON (no flash)
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-        return jsonify({"is_resolved": item.is_resolved})
+        return jsonify({"is_resolved": row.is_resolved})
 
     # Normal request → safe redirect
     flash("Item status updated ✅", "success")
@@ -243,21 +459,44 @@ def update_status(item_id):
 @app.route("/delete_item/<int:item_id>", methods=["POST"])
 @login_required
 def delete_item(item_id):
-    item = Item.query.get_or_404(item_id)
+    # Only matches if the current user owns the item
+    deleted = db.session.execute(
+        delete(Item).where(Item.id == item_id, Item.user_id == current_user.id)
+    ).rowcount
+    db.session.commit()
 
-    if item.user_id != current_user.id:
+    if not deleted:
+        if db.session.scalar(select(Item.id).where(Item.id == item_id)) is None:
+            abort(404)
         flash("You are not allowed to delete this item.", "danger")
         return redirect(url_for("dashboard"))
 
-    db.session.delete(item)
-    db.session.commit()
+    clear_dashboard_cache()
+    drop_recent_item(item_id)
     flash("Item deleted successfully 🗑", "success")
     return redirect(url_for("dashboard"))
 
+# ---------------------------------
+# Database Setup
+# ---------------------------------
+def init_db():
+    db.create_all()
+    # create_all() skips indexes on tables that already exist, and DBs made
+    # this way have no alembic_version for "flask db upgrade" → add them here
+    with db.engine.begin() as conn:
+        for index in Item.__table__.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create missing tables and Item indexes."""
+    init_db()
+    print("Database ready.")
+
 # ---------------------------------
 # Run
 # ---------------------------------
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        init_db()
     app.run(debug=True)
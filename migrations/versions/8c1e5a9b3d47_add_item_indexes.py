@@ -0,0 +1,41 @@
+"""Add indexes on Item for dashboard queries
+
+Revision ID: 8c1e5a9b3d47
+Revises: 4f2d10d276d2
+Create Date: 2026-10-15 10:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e5a9b3d47'
+down_revision = '4f2d10d276d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # "flask init-db" / python app.py may have created these already
+    existing = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('item')}
+    indexes = [
+        ('ix_item_type', ['type']),
+        ('ix_item_date_reported', ['date_reported']),
+        ('ix_item_is_resolved', ['is_resolved']),
+        ('ix_item_user_date', ['user_id', 'date_reported']),
+        ('ix_item_type_resolved', ['type', 'is_resolved']),
+    ]
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        for name, columns in indexes:
+            if name not in existing:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('item', schema=None) as batch_op:
+        batch_op.drop_index('ix_item_type_resolved')
+        batch_op.drop_index('ix_item_user_date')
+        batch_op.drop_index(batch_op.f('ix_item_is_resolved'))
+        batch_op.drop_index(batch_op.f('ix_item_date_reported'))
+        batch_op.drop_index(batch_op.f('ix_item_type'))
@@ -13,8 +13,8 @@ class User(db.Model, UserMixin):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
 
-    # relationship with Item
-    items = db.relationship("Item", backref="user", lazy=True, cascade="all, delete-orphan")
+    # relationship with Item (no lazy loading → use selectinload(User.items) when needed)
+    items = db.relationship("Item", backref="user", lazy="raise", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User {self.name} ({self.email})>"
@@ -25,10 +25,10 @@ class Item(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    type = db.Column(db.String(10), nullable=False)  # Lost / Found
+    type = db.Column(db.String(10), nullable=False, index=True)  # Lost / Found
     location = db.Column(db.String(200), nullable=False)
-    date_reported = db.Column(db.DateTime, default=datetime.utcnow)
-    is_resolved = db.Column(db.Boolean, default=False)
+    date_reported = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    is_resolved = db.Column(db.Boolean, default=False, index=True)
 
     # ✅ Optional image path
     image = db.Column(db.String(200), nullable=True)
@@ -36,5 +36,11 @@ class Item(db.Model):
     # ✅ Foreign key to User
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
 
+    # ✅ Indexes for dashboard counts and "my items" listing
+    __table_args__ = (
+        db.Index("ix_item_user_date", "user_id", "date_reported"),
+        db.Index("ix_item_type_resolved", "type", "is_resolved"),
+    )
+
     def __repr__(self):
         return f"<Item {self.title} ({self.type})>"
@@ -1,11 +1,10 @@
 from flask import Flask, render_template, request, redirect, url_for, flash
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
-from datetime import datetime
 import os
 from werkzeug.utils import secure_filename   # ✅ for safe file names
+from models import db, User, Item
 
 # ---------------------------------
 # App Setup
@@ -15,38 +14,13 @@ app.config["SECRET_KEY"] = "secret-key"
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///lostfound.db"
 app.config["UPLOAD_FOLDER"] = "static/images"
 
-db = SQLAlchemy(app)
+db.init_app(app)
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
 # Token Serializer (for reset password)
 serializer = URLSafeTimedSerializer(app.config["SECRET_KEY"])
 
-# ---------------------------------
-# Models
-# ---------------------------------
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100))
-    email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
-
-    # ✅ Relationship
-    items = db.relationship("Item", backref="user", lazy=True)
-
-class Item(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(100), nullable=False)
-    type = db.Column(db.String(50), nullable=False)  # Lost or Found
-    location = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text, nullable=False)
-    image = db.Column(db.String(200))
-    date_reported = db.Column(db.DateTime, default=datetime.utcnow)
-    is_resolved = db.Column(db.Boolean, default=False)
-
-    # ✅ Foreign key
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-
 # ---------------------------------
 # User Loader
 # ---------------------------------